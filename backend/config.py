@@ -1,22 +1,28 @@
 import os
 from dataclasses import dataclass
+from typing import Tuple
 
 from dotenv import load_dotenv
 
-load_dotenv()
+# Skip the file parse when the orchestrator already populated the environment.
+if os.path.exists(".env"):
+    load_dotenv()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Settings:
     # Data
     raw_csv_path: str = os.getenv("RAW_CSV_PATH", "Tubi-Data.csv")
     persona_csv_path: str = os.getenv("PERSONA_CSV_PATH", "Tubi_with_Personas_and_Clusters.csv")
     clean_csv_path: str = os.getenv("CLEAN_CSV_PATH", "data/clean_titles.csv")
+    clean_parquet_path: str = os.getenv("CLEAN_PARQUET_PATH", "data/clean_titles.parquet")
 
     # Embeddings cache
     embeddings_npy_path: str = os.getenv("EMBEDDINGS_NPY_PATH", "data/embeddings.npy")
     embeddings_meta_path: str = os.getenv("EMBEDDINGS_META_PATH", "data/embeddings_meta.json")
     embedding_model_name: str = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+    # Memory-map the embeddings matrix so multi-worker deployments share pages.
+    embeddings_mmap: bool = os.getenv("EMBEDDINGS_MMAP", "1").lower() not in {"0", "false", "no"}
 
     # LLM API gateway (preferred — OpenAI-compatible proxy)
     llmapi_key: str = os.getenv("LLMAPI_KEY", "")
@@ -34,8 +40,12 @@ class Settings:
     # Telemetry (local JSONL logs; fine for demo + single instance)
     events_log_path: str = os.getenv("EVENTS_LOG_PATH", "data/events.jsonl")
 
-    # CORS for local dev / separate frontend deploys.
-    cors_allow_origins: str = os.getenv("CORS_ALLOW_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173")
+    # CORS for local dev / separate frontend deploys (pre-split once at import).
+    cors_origins: Tuple[str, ...] = tuple(
+        o.strip()
+        for o in os.getenv("CORS_ALLOW_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173").split(",")
+        if o.strip()
+    )
 
 
 settings = Settings()
@@ -2,14 +2,14 @@ from __future__ import annotations
 
 import os
 import time
-from typing import Any, Dict, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from backend.config import settings
-from backend.models import InsightRequest, InsightResponse, SearchRequest, SearchResponse, TelemetrySummary
+from backend.models import InsightRequest, InsightResponse, SearchFilters, SearchRequest, SearchResponse, TelemetrySummary
 from backend.services.data_store import ensure_clean_catalog, filter_mask
 from backend.services.insights_service import generate_hook_and_ad_strategy, generate_hook_and_ad_strategy_gemini, lookup_title_row
 from backend.services.logging_service import EventLogger
@@ -18,10 +18,9 @@ from backend.services.search_service import SearchService
 
 app = FastAPI(title="Tubi Smart-Scout & Ad-Insight API", version="0.1.0")
 
-origins = [o.strip() for o in settings.cors_allow_origins.split(",") if o.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=origins or ["*"],
+    allow_origins=list(settings.cors_origins) or ["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -32,16 +31,26 @@ catalog = ensure_clean_catalog(
     raw_csv_path=settings.raw_csv_path,
     persona_csv_path=settings.persona_csv_path,
     clean_csv_path=settings.clean_csv_path,
+    clean_parquet_path=settings.clean_parquet_path,
 )
 search_service = SearchService(
-    df=catalog.df,
-    data_hash=catalog.data_hash,
+    catalog=catalog,
     embeddings_npy_path=settings.embeddings_npy_path,
     embeddings_meta_path=settings.embeddings_meta_path,
     model_name=settings.embedding_model_name,
+    embeddings_mmap=settings.embeddings_mmap,
 )
 event_logger = EventLogger(settings.events_log_path)
 
+# Pydantic v1 vs v2 dump method, detected once (the version is fixed for the
+# process) instead of hasattr-checking on every search request.
+if hasattr(SearchFilters, "model_dump"):
+    def _filters_dump(f: SearchFilters) -> Dict[str, Any]:
+        return f.model_dump()
+else:
+    def _filters_dump(f: SearchFilters) -> Dict[str, Any]:
+        return f.dict()
+
 
 @app.get("/health")
 def health() -> Dict[str, Any]:
@@ -59,7 +68,7 @@ def api_search(req: SearchRequest) -> SearchResponse:
 
     f = req.filters
     mask = filter_mask(
-        catalog.df,
+        catalog,
         ratings=f.ratings if f else None,
         year_min=f.year_min if f else None,
         year_max=f.year_max if f else None,
@@ -86,10 +95,7 @@ def api_search(req: SearchRequest) -> SearchResponse:
 
     # Best-effort telemetry (never fail user requests).
     try:
-        filters_payload = None
-        if req.filters:
-            # Pydantic v1: dict(); v2: model_dump()
-            filters_payload = req.filters.model_dump() if hasattr(req.filters, "model_dump") else req.filters.dict()
+        filters_payload = _filters_dump(req.filters) if req.filters else None
         event_logger.log(
             "search",
             {
@@ -109,9 +115,46 @@ def api_search(req: SearchRequest) -> SearchResponse:
     return resp
 
 
+# Shared pool for the provider race; abandoned calls finish in the background.
+_insight_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="insight")
+
+# Grace period before hedging with the next provider. Keeps the priority
+# semantics (and quota usage) when the preferred provider is healthy, while
+# bounding the worst case to a race instead of a sum of timeouts.
+_HEDGE_DELAY_S = 2.0
+
+
+def _race_providers(
+    providers: List[Tuple[str, Callable[[], Tuple[str, str, str]]]],
+) -> Tuple[Optional[Tuple[str, str, str]], Optional[str], Optional[Exception]]:
+    """
+    Launch providers in priority order, hedging each after _HEDGE_DELAY_S,
+    and return the first successful (result, model_name). A provider failure
+    triggers the next launch immediately.
+    """
+    pending_launch = list(providers)
+    futures: Dict[Any, str] = {}
+    last_error: Optional[Exception] = None
+
+    while pending_launch or futures:
+        if pending_launch:
+            name, fn = pending_launch.pop(0)
+            futures[_insight_executor.submit(fn)] = name
+        timeout = _HEDGE_DELAY_S if pending_launch else None
+        done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+        for fut in done:
+            name = futures.pop(fut)
+            try:
+                return fut.result(), name, None
+            except Exception as e:
+                last_error = e
+
+    return None, None, last_error
+
+
 @app.post("/api/insights", response_model=InsightResponse)
 def api_insights(req: InsightRequest) -> InsightResponse:
-    row = lookup_title_row(catalog.df, req.title)
+    row = lookup_title_row(catalog, req.title)
     if row is None:
         raise HTTPException(status_code=404, detail="Title not found in catalog.")
 
@@ -126,51 +169,48 @@ def api_insights(req: InsightRequest) -> InsightResponse:
         content_type=str(row.get("content_type") or "unknown"),
     )
 
-    # Priority: llmapi.ai → Gemini → OpenAI.
-    hook = ad_strategy = vertical = model_name = None
-    last_error = None
-
-    # 1) LLM API gateway (OpenAI-compatible proxy)
+    # Priority: llmapi.ai → Gemini → OpenAI (hedged race, first success wins).
+    providers: List[Tuple[str, Callable[[], Tuple[str, str, str]]]] = []
     if settings.llmapi_key:
-        try:
-            hook, ad_strategy, vertical = generate_hook_and_ad_strategy(
-                openai_api_key=settings.llmapi_key,
-                openai_model=settings.llmapi_model,
-                api_base_url=settings.llmapi_base_url,
-                **common_kwargs,
+        providers.append(
+            (
+                settings.llmapi_model,
+                lambda: generate_hook_and_ad_strategy(
+                    openai_api_key=settings.llmapi_key,
+                    openai_model=settings.llmapi_model,
+                    api_base_url=settings.llmapi_base_url,
+                    **common_kwargs,
+                ),
             )
-            model_name = settings.llmapi_model
-        except Exception as e:
-            last_error = e
-
-    # 2) Gemini fallback
-    if hook is None and settings.gemini_api_key:
-        try:
-            hook, ad_strategy, vertical = generate_hook_and_ad_strategy_gemini(
-                gemini_api_key=settings.gemini_api_key,
-                gemini_model=settings.gemini_model,
-                **common_kwargs,
+        )
+    if settings.gemini_api_key:
+        providers.append(
+            (
+                settings.gemini_model,
+                lambda: generate_hook_and_ad_strategy_gemini(
+                    gemini_api_key=settings.gemini_api_key,
+                    gemini_model=settings.gemini_model,
+                    **common_kwargs,
+                ),
             )
-            model_name = settings.gemini_model
-        except Exception as e:
-            last_error = e
-
-    # 3) Direct OpenAI fallback
-    if hook is None:
-        api_key = (req.openai_api_key or "").strip() or settings.openai_api_key
-        if api_key:
-            try:
-                hook, ad_strategy, vertical = generate_hook_and_ad_strategy(
-                    openai_api_key=api_key,
+        )
+    openai_key = (req.openai_api_key or "").strip() or settings.openai_api_key
+    if openai_key:
+        providers.append(
+            (
+                settings.openai_model,
+                lambda: generate_hook_and_ad_strategy(
+                    openai_api_key=openai_key,
                     openai_model=settings.openai_model,
                     **common_kwargs,
-                )
-                model_name = settings.openai_model
-            except Exception as e:
-                last_error = e
+                ),
+            )
+        )
 
-    if hook is None:
+    result, model_name, last_error = _race_providers(providers)
+    if result is None:
         raise HTTPException(status_code=502, detail=f"All LLM providers failed. Last error: {last_error}")
+    hook, ad_strategy, vertical = result
 
     # Telemetry (best effort).
     try:
@@ -196,33 +236,63 @@ def api_insights(req: InsightRequest) -> InsightResponse:
 
 
 # ─── Poster image proxy (resolves & streams image bytes) ───────────────
+import hashlib as _hashlib
 import re as _re
-import requests as _requests
-import time as _time
+import threading as _threading
+from cachetools import TTLCache
 from fastapi.responses import Response
 
-# TTL cache: {tubi_url: (poster_cdn_url, timestamp)}
-_poster_cache: Dict[str, tuple] = {}
 _POSTER_TTL = 600  # 10 minutes – re-resolve if CDN URL expires
-_OG_IMG_RE = _re.compile(r'property="og:image"\s+content="([^"]+)"', _re.IGNORECASE)
-_OG_IMG_RE2 = _re.compile(r'og:image["\']?\s+content=["\']([^"\']+)', _re.IGNORECASE)
+# Bounded TTL cache: {tubi_url: poster_cdn_url-or-None}. The lock guards
+# against concurrent mutation from FastAPI worker threads.
+_poster_cache: TTLCache = TTLCache(maxsize=1024, ttl=_POSTER_TTL)
+# Image bytes keyed by poster_url: (content, media_type, etag). Popular
+# posters are served from RAM instead of re-fetching the CDN.
+_poster_bytes_cache: TTLCache = TTLCache(maxsize=256, ttl=3600)
+_poster_lock = _threading.Lock()
+_CACHE_MISS = object()
+_POSTER_HEADERS = {"Cache-Control": "public, max-age=3600, immutable"}
+# Single alternation over raw bytes: one scan, no 30KB unicode decode
+# (the og:image attribute markup is ASCII).
+_OG_IMG_RE = _re.compile(
+    rb'(?:property=["\']og:image["\']\s+content=["\']|og:image["\']?\s+content=["\'])([^"\']+)',
+    _re.IGNORECASE,
+)
 
 _GOOGLEBOT_UA = "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
 
+# Pooled HTTP session (keep-alive skips TCP+TLS setup on repeat hosts).
+# Created lazily so deployments that never serve posters skip the import.
+_http = None
+
+
+def _get_http():
+    global _http
+    if _http is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        s = requests.Session()
+        s.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=1))
+        s.headers["User-Agent"] = _GOOGLEBOT_UA
+        _http = s
+    return _http
+
 
 def _resolve_poster_url(tubi_url: str) -> Optional[str]:
     """Scrape og:image from a Tubi page. Uses Googlebot UA for reliable results."""
-    now = _time.time()
-    cached = _poster_cache.get(tubi_url)
-    if cached and (now - cached[1]) < _POSTER_TTL:
-        return cached[0]
+    with _poster_lock:
+        cached = _poster_cache.get(tubi_url, _CACHE_MISS)
+    if cached is not _CACHE_MISS:
+        return cached
     try:
-        r = _requests.get(tubi_url, timeout=8, headers={"User-Agent": _GOOGLEBOT_UA})
-        m = _OG_IMG_RE.search(r.text[:30_000]) or _OG_IMG_RE2.search(r.text[:30_000])
-        url = m.group(1) if m else None
+        r = _get_http().get(tubi_url, timeout=8)
+        m = _OG_IMG_RE.search(r.content[:30_000])
+        url = m.group(1).decode("utf-8", errors="replace") if m else None
     except Exception:
         url = None
-    _poster_cache[tubi_url] = (url, now)
+    with _poster_lock:
+        _poster_cache[tubi_url] = url
     return url
 
 
@@ -233,29 +303,43 @@ def api_poster(tubi_url: str) -> Dict[str, Any]:
     return {"tubi_url": tubi_url, "poster_url": poster}
 
 
+def _poster_response(content: bytes, media_type: str, etag: str, if_none_match: Optional[str]) -> Response:
+    if if_none_match == etag:
+        return Response(status_code=304, headers={**_POSTER_HEADERS, "ETag": etag})
+    return Response(content=content, media_type=media_type, headers={**_POSTER_HEADERS, "ETag": etag})
+
+
 @app.get("/api/poster/image")
-def api_poster_image(tubi_url: str) -> Response:
+def api_poster_image(tubi_url: str, request: Request) -> Response:
     """Proxy poster image bytes from Tubi CDN. Avoids CORS and CDN expiry issues."""
     poster_url = _resolve_poster_url(tubi_url)
     if not poster_url:
         return Response(status_code=404, content=b"No poster found")
+
+    if_none_match = request.headers.get("if-none-match")
+    with _poster_lock:
+        cached = _poster_bytes_cache.get(poster_url)
+    if cached is not None:
+        return _poster_response(*cached, if_none_match=if_none_match)
+
     try:
-        r = _requests.get(poster_url, timeout=8, headers={"User-Agent": _GOOGLEBOT_UA})
+        r = _get_http().get(poster_url, timeout=8)
         if r.status_code >= 400:
             # CDN URL expired mid-cache; clear cache and retry once
-            _poster_cache.pop(tubi_url, None)
+            with _poster_lock:
+                _poster_cache.pop(tubi_url, None)
             poster_url = _resolve_poster_url(tubi_url)
             if not poster_url:
                 return Response(status_code=404, content=b"No poster found")
-            r = _requests.get(poster_url, timeout=8, headers={"User-Agent": _GOOGLEBOT_UA})
+            r = _get_http().get(poster_url, timeout=8)
             if r.status_code >= 400:
                 return Response(status_code=502, content=b"Poster CDN error")
-        content_type = r.headers.get("content-type", "image/jpeg")
-        return Response(
-            content=r.content,
-            media_type=content_type,
-            headers={"Cache-Control": "public, max-age=3600"},
-        )
+        content = r.content
+        media_type = r.headers.get("content-type", "image/jpeg")
+        etag = '"%s"' % _hashlib.blake2b(content, digest_size=8).hexdigest()
+        with _poster_lock:
+            _poster_bytes_cache[poster_url] = (content, media_type, etag)
+        return _poster_response(content, media_type, etag, if_none_match=if_none_match)
     except Exception:
         return Response(status_code=502, content=b"Poster fetch failed")
 
@@ -268,22 +352,14 @@ def api_telemetry_summary() -> TelemetrySummary:
 
 @app.get("/api/catalog/stats")
 def api_catalog_stats() -> Dict[str, Any]:
-    df = catalog.df
-    ratings = df["rating"].fillna("Unknown").astype(str).value_counts().to_dict()
-    ctype = df["content_type"].fillna("unknown").astype(str).value_counts().to_dict()
-    years = df["release_year"].dropna()
-    return {
-        "rows": len(df),
-        "ratings": ratings,
-        "content_types": ctype,
-        "year_min": int(years.min()) if not years.empty else None,
-        "year_max": int(years.max()) if not years.empty else None,
-    }
+    return catalog.stats
 
 
 # Optional: serve the built React app from the backend for a single-URL deployment.
 _REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 _FRONTEND_DIST = os.path.join(_REPO_ROOT, "frontend", "dist")
 if os.path.isdir(_FRONTEND_DIST):
+    from fastapi.staticfiles import StaticFiles
+
     # Important: mount after API routes so /api/* still resolves first.
     app.mount("/", StaticFiles(directory=_FRONTEND_DIST, html=True), name="frontend")
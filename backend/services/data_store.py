@@ -1,76 +1,179 @@
+import json
 import os
 import ast
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
 from backend.utils.data_prep import dataframe_hash, prepare_clean_dataframe
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Catalog:
     df: pd.DataFrame
     data_hash: str
-
-
-def ensure_clean_catalog(raw_csv_path: str, persona_csv_path: str, clean_csv_path: str) -> Catalog:
+    # Normalized per-column views cached once at load so the per-query filter
+    # path never re-coerces cell values.
+    rating_series: pd.Series
+    content_type_series: pd.Series
+    release_year_series: pd.Series
+    # Struct-of-arrays views for hot row access (no df.iloc per request).
+    title_arr: np.ndarray
+    genres_list: List[List[str]]
+    # Title -> first row index, for O(1) insight lookups.
+    title_index: Dict[str, int]
+    # Aggregate snapshot for /api/catalog/stats; the catalog is immutable
+    # after startup so this never changes.
+    stats: Dict[str, Any]
+
+
+def _normalize_loaded(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorized coercion (single pandas kernel per column, not .apply per cell),
+    then back to object-with-None so row payloads stay JSON friendly.
+    """
+    for col in ("release_year", "runtime_minutes"):
+        s = pd.to_numeric(df[col], errors="coerce").astype("Int32")
+        df[col] = s.astype(object).where(s.notna(), None)
+    for col in ("rating", "Title_URL", "persona", "content_type"):
+        s = df[col].astype("string")
+        df[col] = s.astype(object).where(s.notna(), None)
+    return df
+
+
+def _write_parquet(df: pd.DataFrame, clean_parquet_path: str) -> None:
+    """Best effort: Parquet is the fast startup path but pyarrow stays optional."""
+    try:
+        df.to_parquet(clean_parquet_path, compression="zstd", index=False)
+    except Exception:
+        pass
+
+
+def _read_parquet(clean_parquet_path: str) -> Optional[pd.DataFrame]:
+    try:
+        df = pd.read_parquet(clean_parquet_path, memory_map=True)
+    except Exception:
+        return None
+    # Arrow list<string> round-trips as ndarrays; internal usage expects lists.
+    df["genres"] = [list(xs) if xs is not None and len(xs) else [] for xs in df["genres"]]
+    return _normalize_loaded(df)
+
+
+def ensure_clean_catalog(
+    raw_csv_path: str,
+    persona_csv_path: str,
+    clean_csv_path: str,
+    clean_parquet_path: Optional[str] = None,
+) -> Catalog:
     os.makedirs(os.path.dirname(clean_csv_path) or ".", exist_ok=True)
 
-    if os.path.exists(clean_csv_path):
+    df = None
+    if clean_parquet_path and os.path.exists(clean_parquet_path):
+        df = _read_parquet(clean_parquet_path)
+
+    if df is not None:
+        pass
+    elif os.path.exists(clean_csv_path):
         df = pd.read_csv(clean_csv_path)
-        # `genres` is serialized; restore to list for internal usage.
-        df["genres"] = df["genres"].apply(
-            lambda x: [] if pd.isna(x) else ast.literal_eval(x) if isinstance(x, str) else x
-        )
-
-        def _to_int_or_none(x):
-            if x is None or (isinstance(x, float) and pd.isna(x)) or pd.isna(x):
-                return None
-            try:
-                return int(float(x))
-            except Exception:
-                return None
-
-        df["release_year"] = df["release_year"].apply(_to_int_or_none)
-        df["runtime_minutes"] = df["runtime_minutes"].apply(_to_int_or_none)
-        df["rating"] = df["rating"].apply(lambda x: None if pd.isna(x) else str(x))
-        df["Title_URL"] = df["Title_URL"].apply(lambda x: None if pd.isna(x) else str(x))
-        df["persona"] = df["persona"].apply(lambda x: None if pd.isna(x) else str(x))
-        df["content_type"] = df["content_type"].apply(lambda x: None if pd.isna(x) else str(x))
+        # `genres` is serialized as JSON arrays; restore to lists for internal
+        # usage. Legacy clean CSVs used repr() — parse per cell with a
+        # literal_eval fallback (same as scripts/build_embeddings.py; a
+        # whole-file sniff misclassifies legacy files whose first row is "[]",
+        # which is also valid JSON) and rewrite once so the next startup takes
+        # the pure JSON path.
+        parsed: List[List[str]] = []
+        legacy = False
+        for s in df["genres"].to_numpy():
+            if not (isinstance(s, str) and s):
+                parsed.append([])
+            else:
+                try:
+                    parsed.append(json.loads(s))
+                except ValueError:
+                    parsed.append(ast.literal_eval(s))
+                    legacy = True
+        df["genres"] = parsed
+        if legacy:
+            migrated = df.copy()
+            migrated["genres"] = migrated["genres"].apply(lambda xs: json.dumps(xs or []))
+            migrated.to_csv(clean_csv_path, index=False)
+
+        df = _normalize_loaded(df)
+        # Promote to Parquet so the next startup skips CSV parsing entirely.
+        if clean_parquet_path:
+            _write_parquet(df, clean_parquet_path)
     else:
         df = prepare_clean_dataframe(raw_csv_path=raw_csv_path, persona_csv_path=persona_csv_path)
-        # Persist as CSV with genres as a stable string representation.
+        # Persist Parquet (fast, dtype-preserving startup path) plus a CSV
+        # fallback with genres as JSON arrays for environments without pyarrow.
+        if clean_parquet_path:
+            _write_parquet(df, clean_parquet_path)
         df_to_save = df.copy()
-        df_to_save["genres"] = df_to_save["genres"].apply(lambda xs: repr(xs or []))
+        df_to_save["genres"] = df_to_save["genres"].apply(lambda xs: json.dumps(xs or []))
         df_to_save.to_csv(clean_csv_path, index=False)
 
     # Hash only deterministic, model-relevant columns.
     h = dataframe_hash(df, cols=("Title", "combined_features", "release_year", "rating", "content_type"))
-    return Catalog(df=df, data_hash=h)
+    title_arr = df["Title"].astype(str).to_numpy(dtype=object)
+    title_index: Dict[str, int] = {}
+    for i, t in enumerate(title_arr):
+        title_index.setdefault(t, i)
+
+    rating_series = df["rating"].astype("string").str.strip().astype("category")
+    content_type_series = df["content_type"].astype("string").str.strip().fillna("unknown").astype("category")
+    release_year_series = pd.to_numeric(df["release_year"], errors="coerce").astype("Int64")
+
+    rating_counts = rating_series.cat.add_categories(["Unknown"]).fillna("Unknown").value_counts()
+    years = release_year_series.dropna()
+    stats: Dict[str, Any] = {
+        "rows": len(df),
+        "ratings": {str(k): int(v) for k, v in rating_counts.items() if v},
+        "content_types": {str(k): int(v) for k, v in content_type_series.value_counts().items() if v},
+        "year_min": int(years.min()) if not years.empty else None,
+        "year_max": int(years.max()) if not years.empty else None,
+    }
+    return Catalog(
+        df=df,
+        data_hash=h,
+        # Tiny-cardinality columns as Categorical: isin/value_counts compare
+        # integer codes instead of hashing Python strings.
+        rating_series=rating_series,
+        content_type_series=content_type_series,
+        release_year_series=release_year_series,
+        title_arr=title_arr,
+        genres_list=list(df["genres"]),
+        title_index=title_index,
+        stats=stats,
+    )
 
 
 def filter_mask(
-    df: pd.DataFrame,
+    catalog: Catalog,
     ratings: Optional[List[str]] = None,
     year_min: Optional[int] = None,
     year_max: Optional[int] = None,
     content_types: Optional[List[str]] = None,
-) -> List[bool]:
-    mask = [True] * len(df)
+) -> np.ndarray:
+    """
+    Vectorized boolean mask aligned to catalog row order.
+    Each predicate ANDs a C-level pandas kernel result instead of looping rows.
+    """
+    mask = np.ones(len(catalog.df), dtype=bool)
 
     if ratings:
         allowed = {str(r).strip() for r in ratings}
-        mask = [m and (str(df.iloc[i].get("rating") or "").strip() in allowed) for i, m in enumerate(mask)]
+        mask &= catalog.rating_series.isin(allowed).fillna(False).to_numpy(dtype=bool)
 
     if year_min is not None:
-        mask = [m and ((df.iloc[i].get("release_year") or 0) >= year_min) for i, m in enumerate(mask)]
+        mask &= catalog.release_year_series.fillna(0).ge(year_min).to_numpy(dtype=bool)
 
     if year_max is not None:
-        mask = [m and ((df.iloc[i].get("release_year") or 10 ** 9) <= year_max) for i, m in enumerate(mask)]
+        mask &= catalog.release_year_series.fillna(10 ** 9).le(year_max).to_numpy(dtype=bool)
 
     if content_types:
         allowed = {str(c).strip() for c in content_types}
-        mask = [m and (str(df.iloc[i].get("content_type") or "unknown") in allowed) for i, m in enumerate(mask)]
+        mask &= catalog.content_type_series.isin(allowed).fillna(False).to_numpy(dtype=bool)
 
     return mask
@@ -3,18 +3,37 @@ from __future__ import annotations
 import json
 import os
 import re
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
-import requests
 
+from backend.services.data_store import Catalog
 from backend.utils.ranking import AD_VERTICALS, suggest_ad_verticals
 
 
 _JSON_BLOCK_RE = re.compile(r"\{.*\}", re.DOTALL)
 
+# Pooled HTTP session so repeat LLM calls reuse the TLS connection.
+# Created lazily so deployments that never serve insights skip the import.
+_http = None
 
+
+def _get_http():
+    global _http
+    if _http is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        s = requests.Session()
+        s.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=1))
+        _http = s
+    return _http
+
+
+@lru_cache(maxsize=1)
 def _load_prompt_template() -> str:
+    """Read the prompt file once; contents are static for the process lifetime."""
     repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
     path = os.path.join(repo_root, "prompts", "hook_and_ad_strategy.txt")
     try:
@@ -132,7 +151,7 @@ def generate_hook_and_ad_strategy_gemini(
         },
     }
 
-    r = requests.post(url, json=payload, timeout=20)
+    r = _get_http().post(url, json=payload, timeout=20)
     if r.status_code >= 400:
         raise RuntimeError(f"Gemini error {r.status_code}: {r.text}")
 
@@ -200,7 +219,7 @@ def generate_hook_and_ad_strategy(
         "temperature": 0.4,
     }
 
-    r = requests.post(url, headers=headers, json=payload, timeout=20)
+    r = _get_http().post(url, headers=headers, json=payload, timeout=20)
     if r.status_code >= 400:
         raise RuntimeError(f"API error {r.status_code}: {r.text}")
     j = r.json()
@@ -223,9 +242,8 @@ def generate_hook_and_ad_strategy(
     return hook, ad_strategy, vertical
 
 
-def lookup_title_row(df: pd.DataFrame, title: str) -> Optional[pd.Series]:
-    m = df["Title"].astype(str) == str(title)
-    hits = df.loc[m]
-    if hits.empty:
+def lookup_title_row(catalog: Catalog, title: str) -> Optional[pd.Series]:
+    i = catalog.title_index.get(str(title))
+    if i is None:
         return None
-    return hits.iloc[0]
+    return catalog.df.iloc[i]
@@ -1,8 +1,37 @@
+import atexit
 import json
 import os
 import threading
 import time
-from typing import Any, Dict, Optional
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson  # ~5x faster serialization; returns bytes directly
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+# How many trailing log lines seed the in-memory aggregate on cold start.
+_SEED_MAX_LINES = 5000
+
+
+def _tail_lines(path: str, max_lines: int, chunk_size: int = 64 * 1024) -> List[str]:
+    """
+    Read at most the last `max_lines` lines of a file.
+    Seeks backwards in fixed chunks so memory and I/O stay bounded no matter
+    how large the log grows.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= max_lines:
+            step = min(chunk_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    return [ln.decode("utf-8", errors="replace") for ln in buf.splitlines()[-max_lines:]]
 
 
 class EventLogger:
@@ -15,68 +44,69 @@ class EventLogger:
         if d:
             os.makedirs(d, exist_ok=True)
 
+        # Persistent append handle: one write syscall per event instead of
+        # open+write+close. Unbuffered so lines land immediately.
+        self._fh = open(path, "ab", buffering=0)
+        atexit.register(self._fh.close)
+
+        # Live aggregate updated on the write path so summarize() never has
+        # to re-parse the log. Seeded once from the file tail on cold start.
+        self._total_searches = 0
+        self._latency_sum = 0.0
+        self._latency_n = 0
+        self._engine_breakdown: Counter = Counter()
+        self._query_counts: Counter = Counter()
+        if os.path.exists(path):
+            for ln in _tail_lines(path, _SEED_MAX_LINES):
+                ln = ln.strip()
+                if not ln:
+                    continue
+                try:
+                    evt = json.loads(ln)
+                except Exception:
+                    continue
+                self._ingest(evt)
+
+    def _ingest(self, evt: Dict[str, Any]) -> None:
+        if evt.get("type") != "search":
+            return
+        self._total_searches += 1
+        p = evt.get("payload", {}) or {}
+        q = str(p.get("query", "")).strip().lower()
+        if q:
+            self._query_counts[q] += 1
+        eng = str(p.get("engine_type", "")).strip() or "unknown"
+        self._engine_breakdown[eng] += 1
+        lat = p.get("latency_ms")
+        if isinstance(lat, (int, float)):
+            self._latency_sum += float(lat)
+            self._latency_n += 1
+
     def log(self, event_type: str, payload: Dict[str, Any]) -> None:
         evt = {
             "ts": int(time.time() * 1000),
             "type": event_type,
             "payload": payload,
         }
-        line = json.dumps(evt, ensure_ascii=True)
+        if orjson is not None:
+            line = orjson.dumps(evt) + b"\n"
+        else:
+            line = (json.dumps(evt, ensure_ascii=True) + "\n").encode("utf-8")
         with self._lock:
-            with open(self._path, "a", encoding="utf-8") as f:
-                f.write(line + "\n")
+            self._ingest(evt)
+            self._fh.write(line)
 
-    def summarize(self, max_lines: int = 5000) -> Dict[str, Any]:
+    def summarize(self) -> Dict[str, Any]:
         """
         Lightweight aggregation for the Insights tab.
-        Reads last N lines to avoid large-file issues.
+        Returns a snapshot of the live counters; O(1) in log size.
         """
-        if not os.path.exists(self._path):
+        with self._lock:
+            top_queries = self._query_counts.most_common(10)
             return {
-                "total_searches": 0,
-                "top_queries": [],
-                "avg_latency_ms": None,
-                "engine_breakdown": {},
+                "total_searches": self._total_searches,
+                "top_queries": [{"query": q, "count": c} for q, c in top_queries],
+                "avg_latency_ms": (self._latency_sum / self._latency_n) if self._latency_n else None,
+                "engine_breakdown": dict(self._engine_breakdown),
             }
 
-        # Read last max_lines lines.
-        with self._lock:
-            with open(self._path, "r", encoding="utf-8") as f:
-                lines = f.readlines()[-max_lines:]
-
-        total_searches = 0
-        latency_sum = 0
-        latency_n = 0
-        engine_breakdown: Dict[str, int] = {}
-        query_counts: Dict[str, int] = {}
-
-        for ln in lines:
-            ln = ln.strip()
-            if not ln:
-                continue
-            try:
-                evt = json.loads(ln)
-            except Exception:
-                continue
-            if evt.get("type") != "search":
-                continue
-            total_searches += 1
-            p = evt.get("payload", {}) or {}
-            q = str(p.get("query", "")).strip().lower()
-            if q:
-                query_counts[q] = query_counts.get(q, 0) + 1
-            eng = str(p.get("engine_type", "")).strip() or "unknown"
-            engine_breakdown[eng] = engine_breakdown.get(eng, 0) + 1
-            lat = p.get("latency_ms")
-            if isinstance(lat, (int, float)):
-                latency_sum += float(lat)
-                latency_n += 1
-
-        top_queries = sorted(query_counts.items(), key=lambda kv: kv[1], reverse=True)[:10]
-        return {
-            "total_searches": total_searches,
-            "top_queries": [{"query": q, "count": c} for q, c in top_queries],
-            "avg_latency_ms": (latency_sum / latency_n) if latency_n else None,
-            "engine_breakdown": engine_breakdown,
-        }
-
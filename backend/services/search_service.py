@@ -11,8 +11,10 @@ import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
 
 from backend.models import MovieResult
+from backend.services.data_store import Catalog
+from backend.utils import search_kernels
 from backend.utils.brand_safety import brand_safety
-from backend.utils.ranking import MonetizationBreakdown, monetization_score, suggest_ad_verticals
+from backend.utils.ranking import monetization_scores, suggest_ad_verticals
 
 
 @dataclass(frozen=True)
@@ -32,13 +34,43 @@ class BaseSearchEngine:
         """
         raise NotImplementedError
 
+    def masked_similarities(self, query: str, mask: np.ndarray) -> np.ndarray:
+        """
+        Similarity scores with masked-out rows at -inf. Engines may fuse the
+        scoring and masking passes; the default just masks after the fact.
+        """
+        return np.where(mask, self.query_similarities(query), np.float32(-np.inf))
+
 
 class TfidfSearchEngine(BaseSearchEngine):
-    def __init__(self, df: pd.DataFrame, data_hash: str) -> None:
-        self._df = df
+    def __init__(self, texts: List[str], data_hash: str, cache_dir: Optional[str] = "data") -> None:
         self._data_hash = data_hash
+
+        # Fitted vectorizer + matrix are persisted keyed by data_hash (same
+        # validation idea as the embeddings cache), so restarts skip the
+        # full-catalog fit_transform. Cache problems just mean a refit.
+        cache_path = os.path.join(cache_dir, f"tfidf_{data_hash}.joblib") if cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                import joblib  # sklearn dependency; lazy like other heavy imports
+
+                cached = joblib.load(cache_path)
+                self._vectorizer = cached["vectorizer"]
+                self._matrix = cached["matrix"]
+                return
+            except Exception:
+                pass
+
         self._vectorizer = TfidfVectorizer()
-        self._matrix = self._vectorizer.fit_transform(df["combined_features"].fillna("").astype(str).tolist())
+        self._matrix = self._vectorizer.fit_transform(texts)
+        if cache_path:
+            try:
+                import joblib
+
+                os.makedirs(cache_dir, exist_ok=True)
+                joblib.dump({"vectorizer": self._vectorizer, "matrix": self._matrix}, cache_path, compress=3)
+            except Exception:
+                pass
 
     def meta(self) -> EngineMeta:
         return EngineMeta(engine_type="tfidf", model_name="tfidf", data_hash=self._data_hash)
@@ -53,13 +85,13 @@ class TfidfSearchEngine(BaseSearchEngine):
 class EmbeddingSearchEngine(BaseSearchEngine):
     def __init__(
         self,
-        df: pd.DataFrame,
+        expected_rows: int,
         data_hash: str,
         embeddings_npy_path: str,
         embeddings_meta_path: str,
         model_name: str,
+        mmap: bool = True,
     ) -> None:
-        self._df = df
         self._data_hash = data_hash
         self._model_name = model_name
 
@@ -73,181 +105,270 @@ class EmbeddingSearchEngine(BaseSearchEngine):
         if meta.get("model_name") != model_name:
             raise RuntimeError("Embeddings cache model mismatch. Rebuild embeddings.")
 
-        self._emb = np.load(embeddings_npy_path)
-        if self._emb.shape[0] != len(df):
+        base, _ = os.path.splitext(embeddings_npy_path)
+        q_path = base + "_q.npy"
+        scales_path = base + "_scales.npy"
+        if meta.get("quantized") and os.path.exists(q_path) and os.path.exists(scales_path):
+            # int8 cache is ~4x smaller on disk; dequantize once at load
+            # (NumPy has no int8 GEMM, so queries stay on the fp32 BLAS path).
+            self._emb = np.load(q_path).astype(np.float32) * np.load(scales_path)
+            # int8 rounding perturbs row norms slightly; renormalize below.
+            already_normalized = False
+        else:
+            # mmap shares read-only pages across uvicorn workers instead of
+            # duplicating the matrix in each process RSS.
+            self._emb = np.load(embeddings_npy_path, mmap_mode="r" if mmap else None)
+            already_normalized = bool(meta.get("normalized"))
+        if self._emb.shape[0] != expected_rows:
             raise RuntimeError("Embeddings cache row count mismatch. Rebuild embeddings.")
 
-        # Lazy import so the backend can still run in TF-IDF mode without the dependency.
-        from sentence_transformers import SentenceTransformer  # type: ignore
+        self._load_query_encoder(model_name)
 
-        self._model = SentenceTransformer(model_name)
+        # Ensure normalized for cosine via dot product. Caches built with the
+        # "normalized" meta flag skip this: it would materialize a full copy
+        # and defeat the mmap sharing above. einsum row-wise squared norms
+        # skip np.linalg.norm's dispatch overhead and stay in float32.
+        if not already_normalized:
+            sq = np.einsum("ij,ij->i", self._emb, self._emb, dtype=np.float32)
+            norms = np.sqrt(sq, dtype=np.float32).reshape(-1, 1) + np.float32(1e-12)
+            self._emb = (self._emb / norms).astype(np.float32, copy=False)
 
-        # Ensure normalized for cosine via dot product.
-        norms = np.linalg.norm(self._emb, axis=1, keepdims=True) + 1e-12
-        self._emb = (self._emb / norms).astype(np.float32)
+        # Compile the fused scoring kernel (no-op without numba) so the first
+        # request doesn't pay for JIT.
+        search_kernels.warmup(self._emb)
 
     def meta(self) -> EngineMeta:
         return EngineMeta(engine_type="embeddings", model_name=self._model_name, data_hash=self._data_hash)
 
     def query_similarities(self, query: str) -> np.ndarray:
-        q = self._model.encode([query], normalize_embeddings=True)
-        qv = np.asarray(q, dtype=np.float32).reshape(-1)
+        qv = self._encode_query(query)
         sims = self._emb @ qv
         return sims.astype(np.float32)
 
+    def masked_similarities(self, query: str, mask: np.ndarray) -> np.ndarray:
+        # Fused dot + mask: one streaming pass over the matrix under numba.
+        return search_kernels.masked_similarities(self._emb, self._encode_query(query), mask)
+
+    def _load_query_encoder(self, model_name: str) -> None:
+        # Prefer an ONNX Runtime export when optimum is installed: CPU encode
+        # of a 1-query batch is typically 2-4x faster than the PyTorch path.
+        # Both branches are lazy imports so the backend can still run in
+        # TF-IDF mode without any of these dependencies.
+        self._tokenizer = None
+        self._ort_model = None
+        try:
+            from optimum.onnxruntime import ORTModelForFeatureExtraction  # type: ignore
+            from transformers import AutoTokenizer  # type: ignore
+
+            hf_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+            self._tokenizer = AutoTokenizer.from_pretrained(hf_name)
+            self._ort_model = ORTModelForFeatureExtraction.from_pretrained(
+                hf_name, export=True, provider="CPUExecutionProvider"
+            )
+            self._model = None
+            return
+        except Exception:
+            self._tokenizer = None
+            self._ort_model = None
+
+        from sentence_transformers import SentenceTransformer  # type: ignore
+
+        try:
+            import torch  # type: ignore
+
+            torch.set_num_threads(max(1, os.cpu_count() or 1))
+        except Exception:
+            pass
+        self._model = SentenceTransformer(model_name)
+
+    def _encode_query(self, query: str) -> np.ndarray:
+        if self._ort_model is not None:
+            toks = self._tokenizer([query], return_tensors="np", padding=True, truncation=True)
+            hidden = np.asarray(self._ort_model(**toks).last_hidden_state, dtype=np.float32)
+            # Mean-pool over real tokens + L2-normalize: matches
+            # SentenceTransformer's encode(..., normalize_embeddings=True).
+            attn = np.asarray(toks["attention_mask"], dtype=np.float32)[..., None]
+            vec = (hidden * attn).sum(axis=1) / np.clip(attn.sum(axis=1), 1e-9, None)
+            vec = vec.reshape(-1)
+            return vec / (np.linalg.norm(vec) + np.float32(1e-12))
+        q = self._model.encode([query], normalize_embeddings=True)
+        return np.asarray(q, dtype=np.float32).reshape(-1)
+
 
 def pick_engine(
-    df: pd.DataFrame,
+    texts: List[str],
     data_hash: str,
     embeddings_npy_path: str,
     embeddings_meta_path: str,
     model_name: str,
+    mmap: bool = True,
 ) -> BaseSearchEngine:
     try:
         return EmbeddingSearchEngine(
-            df=df,
+            expected_rows=len(texts),
             data_hash=data_hash,
             embeddings_npy_path=embeddings_npy_path,
             embeddings_meta_path=embeddings_meta_path,
             model_name=model_name,
+            mmap=mmap,
         )
     except Exception:
-        return TfidfSearchEngine(df=df, data_hash=data_hash)
-
-
-def build_results(
-    df: pd.DataFrame,
-    sims: np.ndarray,
-    mask: List[bool],
-    top_k: int,
-    alpha: float,
-    include_debug: bool,
-) -> List[MovieResult]:
-    def _none_if_na(x):
-        try:
-            return None if x is None or pd.isna(x) else x
-        except Exception:
-            return None if x is None else x
-
-    # Apply mask and rank by similarity first (recall layer).
-    candidate_idxs = [i for i, ok in enumerate(mask) if ok]
-    if not candidate_idxs:
-        return []
-
-    cand_sims = [(i, float(sims[i])) for i in candidate_idxs]
-    cand_sims.sort(key=lambda x: x[1], reverse=True)
-    anchor_idx = cand_sims[0][0]
-    anchor_persona = _none_if_na(df.iloc[anchor_idx].get("persona"))
-    top_idxs = [i for i, _ in cand_sims[: max(top_k * 5, top_k)]]  # widen before rerank
-
-    results: List[Tuple[int, float, float, float, MonetizationBreakdown, Dict[str, Any]]] = []
-    for i in top_idxs:
-        row = df.iloc[i]
-        genres = _none_if_na(row.get("genres")) or []
-        rating = _none_if_na(row.get("rating"))
-        runtime_minutes = _none_if_na(row.get("runtime_minutes"))
-        content_type = _none_if_na(row.get("content_type")) or "unknown"
-
-        rel = float(sims[i])
-        mon, mon_dbg = monetization_score(
-            rating=rating,
-            runtime_minutes=(int(runtime_minutes) if runtime_minutes is not None else None),
-            genres=genres,
-            content_type=content_type,
-        )
-        fin = float(alpha) * rel + (1.0 - float(alpha)) * mon
+        return TfidfSearchEngine(texts=texts, data_hash=data_hash)
 
-        # Persona cohesion: keep recs coherent within a discovered segment.
-        # This is intentionally a small boost so it doesn't override relevance/monetization.
-        persona = _none_if_na(row.get("persona"))
-        persona_bonus = 0.03 if (anchor_persona and persona == anchor_persona) else 0.0
-        fin = fin + persona_bonus
-
-        dbg: Dict[str, Any] = {}
-        if include_debug:
-            dbg = {
-                "raw_similarity": rel,
-                "monetization_breakdown": mon_dbg.__dict__,
-                "anchor_persona": anchor_persona,
-                "persona_bonus": persona_bonus,
-            }
-        results.append((i, rel, mon, fin, mon_dbg, dbg))
-
-    # Final sort by multi-objective score.
-    results.sort(key=lambda x: x[3], reverse=True)
-    results = results[:top_k]
-
-    out: List[MovieResult] = []
-    for i, rel, mon, fin, _mon_dbg, dbg in results:
-        row = df.iloc[i]
-        genres = _none_if_na(row.get("genres")) or []
-        rating = _none_if_na(row.get("rating"))
-        release_year = _none_if_na(row.get("release_year"))
-        runtime_minutes = _none_if_na(row.get("runtime_minutes"))
-        content_type = _none_if_na(row.get("content_type")) or "unknown"
-        tier, risk, notes = brand_safety(rating=rating, genres=genres)
-        verticals = suggest_ad_verticals(genres=genres, rating=rating)
-        out.append(
-            MovieResult(
-                title=str(row.get("Title")),
-                title_url=row.get("Title_URL"),
-                release_year=(int(release_year) if release_year is not None else None),
-                runtime_minutes=(int(runtime_minutes) if runtime_minutes is not None else None),
-                rating=rating,
-                genres=list(genres),
-                persona=_none_if_na(row.get("persona")),
-                content_type=str(content_type),
-                relevance_score=float(rel),
-                monetization_score=float(mon),
-                final_score=float(fin),
-                brand_safety={"tier": tier, "risk": risk, "notes": notes},
-                ad_opportunity={
-                    "primary_vertical": verticals[0],
-                    "secondary_verticals": verticals[1:],
-                    "rationale": "Rules-based advertiser fit derived from genre + rating (proxy).",
-                },
-                debug=dbg or None,
-            )
-        )
-    return out
+
+def _clean_object_column(series: pd.Series) -> np.ndarray:
+    """Object array with every NA variant (NaN/NaT/pd.NA) replaced by None."""
+    arr = series.to_numpy(dtype=object)
+    return np.where(pd.isna(arr), None, arr)
 
 
 class SearchService:
     def __init__(
         self,
-        df: pd.DataFrame,
-        data_hash: str,
+        catalog: Catalog,
         embeddings_npy_path: str,
         embeddings_meta_path: str,
         model_name: str,
+        embeddings_mmap: bool = True,
     ) -> None:
-        self._df = df
+        # The dataframe is only touched here at build time; the query hot
+        # path works exclusively off the arrays below (no .iloc / label
+        # resolution per result row). Anything needing a dataframe view
+        # should go through the Catalog, not this service.
+        df = catalog.df
+
+        # SoA views of the hot row fields: integer array indexing instead of
+        # df.iloc (which builds a Series per access) in the result loops.
+        # NA values are replaced with None here, once, so the result loop can
+        # use cells directly without per-scalar pd.isna checks.
+        self._titles = _clean_object_column(df["Title"])
+        self._urls = _clean_object_column(df["Title_URL"])
+        self._ratings = _clean_object_column(df["rating"])
+        self._runtime = _clean_object_column(df["runtime_minutes"])
+        self._years = _clean_object_column(df["release_year"])
+        self._ctype = _clean_object_column(df["content_type"])
+        self._personas = _clean_object_column(df["persona"])
+        self._genres = df["genres"].to_list()
+
+        # Monetization / brand-safety / verticals depend only on static row
+        # fields, so score every row once here instead of per query.
+        n = len(df)
+        self._mon, self._mon_breakdown = monetization_scores(
+            ratings=list(self._ratings),
+            runtime_minutes=list(self._runtime),
+            genres_list=self._genres,
+            content_types=[ct or "unknown" for ct in self._ctype],
+        )
+        self._brand_safety: List[Tuple[str, str, List[str]]] = []
+        self._verticals: List[List[str]] = []
+        for i in range(n):
+            genres = self._genres[i] or []
+            self._brand_safety.append(brand_safety(rating=self._ratings[i], genres=genres))
+            self._verticals.append(suggest_ad_verticals(genres=genres, rating=self._ratings[i]))
+
+        texts = df["combined_features"].fillna("").astype(str).tolist()
         self._engine = pick_engine(
-            df=df,
-            data_hash=data_hash,
+            texts=texts,
+            data_hash=catalog.data_hash,
             embeddings_npy_path=embeddings_npy_path,
             embeddings_meta_path=embeddings_meta_path,
             model_name=model_name,
+            mmap=embeddings_mmap,
         )
         self._meta = self._engine.meta()
 
     def meta(self) -> EngineMeta:
         return self._meta
 
+    def _build_results(
+        self,
+        sims_masked: np.ndarray,
+        mask_arr: np.ndarray,
+        top_k: int,
+        alpha: float,
+        include_debug: bool,
+    ) -> List[MovieResult]:
+        # Fancy-index the candidate rows (C-level flatnonzero, no Python
+        # iteration over the mask) and blend the multi-objective score over
+        # the whole pool at once; sims_masked has filtered-out rows at -inf.
+        cand = np.flatnonzero(mask_arr)
+        rels = sims_masked[cand].astype(np.float32)
+        mons = self._mon[cand]
+        # Persona cohesion: keep recs coherent within a discovered segment.
+        # Anchored on the most similar candidate; intentionally a small boost
+        # so it doesn't override relevance/monetization.
+        anchor_persona = self._personas[int(cand[np.argmax(rels)])]
+        if anchor_persona:
+            bonuses = np.where(self._personas[cand] == anchor_persona, np.float32(0.03), np.float32(0.0))
+        else:
+            bonuses = np.zeros(cand.size, dtype=np.float32)
+        fins = np.float32(alpha) * rels + np.float32(1.0 - alpha) * mons + bonuses
+
+        # O(N) argpartition for the final top_k; only those K rows get sorted
+        # and materialized into MovieResult.
+        K = min(top_k, cand.size)
+        sel = np.argpartition(-fins, K - 1)[:K]
+        sel = sel[np.argsort(-fins[sel])]
+
+        out: List[MovieResult] = []
+        for j in sel:
+            i = int(cand[j])
+            rel, mon, fin = float(rels[j]), float(mons[j]), float(fins[j])
+            dbg: Dict[str, Any] = {}
+            if include_debug:
+                dbg = {
+                    "raw_similarity": rel,
+                    "monetization_breakdown": self._mon_breakdown[i].__dict__,
+                    "anchor_persona": anchor_persona,
+                    "persona_bonus": float(bonuses[j]),
+                }
+            genres = self._genres[i] or []
+            rating = self._ratings[i]
+            release_year = self._years[i]
+            runtime_minutes = self._runtime[i]
+            content_type = self._ctype[i] or "unknown"
+            tier, risk, notes = self._brand_safety[i]
+            verticals = self._verticals[i]
+            out.append(
+                MovieResult(
+                    title=str(self._titles[i]),
+                    title_url=self._urls[i],
+                    release_year=(int(release_year) if release_year is not None else None),
+                    runtime_minutes=(int(runtime_minutes) if runtime_minutes is not None else None),
+                    rating=rating,
+                    genres=list(genres),
+                    persona=self._personas[i],
+                    content_type=str(content_type),
+                    relevance_score=float(rel),
+                    monetization_score=float(mon),
+                    final_score=float(fin),
+                    brand_safety={"tier": tier, "risk": risk, "notes": notes},
+                    ad_opportunity={
+                        "primary_vertical": verticals[0],
+                        "secondary_verticals": verticals[1:],
+                        "rationale": "Rules-based advertiser fit derived from genre + rating (proxy).",
+                    },
+                    debug=dbg or None,
+                )
+            )
+        return out
+
     def search(
         self,
         query: str,
-        mask: List[bool],
+        mask: np.ndarray,
         top_k: int,
         alpha: float,
         include_debug: bool,
     ) -> Tuple[List[MovieResult], int]:
         t0 = time.time()
-        sims = self._engine.query_similarities(query)
-        results = build_results(
-            df=self._df,
-            sims=sims,
-            mask=mask,
+        mask_arr = np.asarray(mask, dtype=bool)
+        if not mask_arr.any():
+            return [], int((time.time() - t0) * 1000)
+        sims_masked = self._engine.masked_similarities(query, mask_arr)
+        results = self._build_results(
+            sims_masked=sims_masked,
+            mask_arr=mask_arr,
             top_k=top_k,
             alpha=alpha,
             include_debug=include_debug,
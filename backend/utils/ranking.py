@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
 
 AD_VERTICALS: Tuple[str, ...] = (
     "CPG",
@@ -53,6 +56,50 @@ _GENRE_PREMIUM: Dict[str, float] = {
 }
 
 
+# Integer genre IDs: string normalization happens once per distinct genre
+# (memoized below) and the premium table becomes an array lookup. ID -1 is
+# the "unknown genre" slot, which indexes the trailing default in the array.
+_GENRE_ID: Dict[str, int] = {g: i for i, g in enumerate(sorted(_GENRE_PREMIUM))}
+_GENRE_PREMIUM_ARR = np.array(
+    [_GENRE_PREMIUM[g] for g in sorted(_GENRE_PREMIUM)] + [0.65], dtype=np.float32
+)
+
+
+@lru_cache(maxsize=2048)
+def _genre_id(g: str) -> int:
+    return _GENRE_ID.get(str(g).strip().lower(), -1)
+
+
+def _genre_bits(genres: Tuple[str, ...]) -> int:
+    bits = 0
+    for g in genres:
+        i = _genre_id(g)
+        if i >= 0:
+            bits |= 1 << i
+    return bits
+
+
+def _mask(*genres: str) -> int:
+    m = 0
+    for g in genres:
+        m |= 1 << _GENRE_ID[g]
+    return m
+
+
+# Vertical rule masks: one bitwise-and per rule instead of set intersections.
+_KIDS_MASK = _mask("kids & family")
+_ACTION_MASK = _mask("action", "thriller", "sci-fi", "adventure")
+_DRAMA_MASK = _mask("drama", "romance")
+_DOC_MASK = _mask("documentary")
+_COMEDY_MASK = _mask("comedy")
+_EDGY_MASK = _mask("horror", "crime")
+
+_KID_RATINGS = frozenset({"TV-Y", "TV-Y7", "TV-Y7_FV", "TV-G", "G"})
+
+_RATING_IDX: Dict[str, int] = {r: i for i, r in enumerate(_RATING_BRAND_FRIENDLINESS)}
+_RATING_VALS = np.array(list(_RATING_BRAND_FRIENDLINESS.values()), dtype=np.float32)
+
+
 @dataclass(frozen=True)
 class MonetizationBreakdown:
     rating_score: float
@@ -81,15 +128,13 @@ def runtime_inventory_score(runtime_minutes: Optional[int], content_type: str) -
 def genre_premium_score(genres: List[str]) -> float:
     if not genres:
         return 0.65
-    scores = []
-    for g in genres:
-        s = _GENRE_PREMIUM.get(str(g).strip().lower())
-        if s is not None:
-            scores.append(s)
-    if not scores:
+    # If multiple genres, take the max as "primary appeal" proxy. Unknown
+    # genres are dropped (not defaulted) so a low-premium known genre still
+    # wins over them, matching the old dict-lookup behavior.
+    ids = [i for i in (_genre_id(g) for g in genres) if i >= 0]
+    if not ids:
         return 0.65
-    # If multiple genres, take the max as "primary appeal" proxy.
-    return float(max(scores))
+    return float(_GENRE_PREMIUM_ARR[ids].max())
 
 
 def monetization_score(
@@ -107,24 +152,62 @@ def monetization_score(
     return clamp01(score), MonetizationBreakdown(rating_score=r_score, length_score=l_score, genre_score=g_score)
 
 
+def monetization_scores(
+    ratings: List[Optional[str]],
+    runtime_minutes: List[Optional[int]],
+    genres_list: List[List[str]],
+    content_types: List[str],
+) -> Tuple[np.ndarray, List[MonetizationBreakdown]]:
+    """
+    Vectorized monetization_score over the whole catalog: rating lookup is a
+    numpy gather, the runtime/weighting math is three array ops, and only the
+    genre max stays per-row (ragged lists). Same numbers as the scalar path.
+    """
+    rating_ids = np.array([_RATING_IDX.get(str(r or "").strip(), -1) for r in ratings], dtype=np.intp)
+    r_vec = np.where(rating_ids >= 0, _RATING_VALS[rating_ids.clip(min=0)], np.float32(0.65))
+
+    rt = np.array([float(m) if (m is not None and m == m) else 0.0 for m in runtime_minutes], dtype=np.float32)
+    is_series = np.array([ct == "series" for ct in content_types], dtype=bool)
+    l_vec = np.where(
+        is_series,
+        np.float32(0.60),
+        np.where(rt > 0, np.clip((rt - 60.0) / 80.0, 0.0, 1.0), np.float32(0.50)),
+    ).astype(np.float32)
+
+    g_vec = np.array([genre_premium_score(gs or []) for gs in genres_list], dtype=np.float32)
+
+    mon = np.clip(0.50 * r_vec + 0.20 * l_vec + 0.30 * g_vec, 0.0, 1.0).astype(np.float32)
+    breakdowns = [
+        MonetizationBreakdown(rating_score=float(r_vec[i]), length_score=float(l_vec[i]), genre_score=float(g_vec[i]))
+        for i in range(len(mon))
+    ]
+    return mon, breakdowns
+
+
 def suggest_ad_verticals(genres: List[str], rating: Optional[str]) -> List[str]:
     """
     Rules-based vertical suggestions (used both as a fallback and as context for the LLM).
     """
-    gset = {str(g).strip().lower() for g in (genres or [])}
+    key = tuple(genres or [])
+    return list(_suggest_ad_verticals_cached(key, None if rating is None else str(rating)))
+
+
+@lru_cache(maxsize=1024)
+def _suggest_ad_verticals_cached(genres: Tuple[str, ...], rating: Optional[str]) -> Tuple[str, ...]:
+    bits = _genre_bits(genres)
     verticals: List[str] = []
 
-    if "kids & family" in gset or str(rating or "").strip() in {"TV-Y", "TV-Y7", "TV-Y7_FV", "TV-G", "G"}:
+    if bits & _KIDS_MASK or str(rating or "").strip() in _KID_RATINGS:
         verticals += ["CPG", "QSR", "Retail"]
-    if any(g in gset for g in ["action", "thriller", "sci-fi", "adventure"]):
+    if bits & _ACTION_MASK:
         verticals += ["Auto", "Gaming", "Tech"]
-    if any(g in gset for g in ["drama", "romance"]):
+    if bits & _DRAMA_MASK:
         verticals += ["Insurance", "Travel", "Retail"]
-    if "documentary" in gset:
+    if bits & _DOC_MASK:
         verticals += ["Financial Services", "Tech", "Health & Wellness"]
-    if any(g in gset for g in ["comedy"]):
+    if bits & _COMEDY_MASK:
         verticals += ["QSR", "CPG", "Retail"]
-    if any(g in gset for g in ["horror", "crime"]):
+    if bits & _EDGY_MASK:
         verticals += ["Entertainment", "Gaming"]
 
     # De-dupe while preserving order.
@@ -136,5 +219,5 @@ def suggest_ad_verticals(genres: List[str], rating: Optional[str]) -> List[str]:
             seen.add(v)
     if not out:
         out = ["CPG", "Retail", "Entertainment"]
-    return out[:5]
+    return tuple(out[:5])
 
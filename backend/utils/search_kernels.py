@@ -0,0 +1,51 @@
+"""
+Optional numba-accelerated search kernels.
+
+numba is not a hard dependency: when it is missing (or a kernel rejects the
+input types) everything falls back to the equivalent NumPy expressions, same
+as the sentence-transformers lazy import in the search service.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange  # type: ignore
+
+    _HAS_NUMBA = True
+except ImportError:  # pragma: no cover
+    _HAS_NUMBA = False
+
+
+if _HAS_NUMBA:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _masked_sims_numba(emb, qv, mask):  # pragma: no cover - compiled
+        n, d = emb.shape
+        out = np.full(n, -np.inf, np.float32)
+        for i in prange(n):
+            if mask[i]:
+                s = np.float32(0.0)
+                for j in range(d):
+                    s += emb[i, j] * qv[j]
+                out[i] = s
+        return out
+
+
+def masked_similarities(emb: np.ndarray, qv: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Dot products of `qv` against every row of `emb`, with masked-out rows set
+    to -inf, in one streaming pass (fused dot + mask under numba; BLAS matvec
+    plus np.where otherwise).
+    """
+    if _HAS_NUMBA:
+        try:
+            return _masked_sims_numba(emb, qv, mask)
+        except Exception:
+            pass
+    return np.where(mask, emb @ qv, np.float32(-np.inf))
+
+
+def warmup(emb: np.ndarray) -> None:
+    """Trigger JIT compilation at startup so the first query doesn't pay for it."""
+    if _HAS_NUMBA and emb.ndim == 2:
+        masked_similarities(emb[:1], np.zeros(emb.shape[1], dtype=emb.dtype), np.zeros(1, dtype=bool))
@@ -6,7 +6,7 @@ import json
 import os
 import sys
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -22,12 +22,19 @@ from backend.services.data_store import ensure_clean_catalog
 
 @dataclass(frozen=True)
 class Expectation:
-    genres_any: List[str]
+    genres_any: FrozenSet[str]
     year_min: Optional[int] = None
     year_max: Optional[int] = None
-    ratings_any: Optional[List[str]] = None
+    ratings_any: Optional[FrozenSet[str]] = None
     runtime_max: Optional[int] = None
 
+    def __post_init__(self) -> None:
+        # Coerce whatever iterable came from JSON into frozensets once, so
+        # is_relevant never rebuilds a set per candidate row.
+        object.__setattr__(self, "genres_any", frozenset(str(g) for g in (self.genres_any or [])))
+        if self.ratings_any is not None:
+            object.__setattr__(self, "ratings_any", frozenset(str(r) for r in self.ratings_any))
+
 
 def load_queries(path: str) -> List[Tuple[str, Expectation]]:
     out = []
@@ -43,7 +50,7 @@ def load_queries(path: str) -> List[Tuple[str, Expectation]]:
                 (
                     q,
                     Expectation(
-                        genres_any=list(e.get("genres_any") or []),
+                        genres_any=e.get("genres_any") or [],
                         year_min=e.get("year_min"),
                         year_max=e.get("year_max"),
                         ratings_any=e.get("ratings_any"),
@@ -54,26 +61,24 @@ def load_queries(path: str) -> List[Tuple[str, Expectation]]:
     return out
 
 
-def is_relevant(row: pd.Series, exp: Expectation) -> bool:
-    genres = row.get("genres") or []
-    gset = {str(g) for g in genres}
-    if exp.genres_any:
-        if not any(g in gset for g in exp.genres_any):
-            return False
+def is_relevant(rec: Dict[str, Any], exp: Expectation) -> bool:
+    genres = rec.get("genres") or []
+    if exp.genres_any and exp.genres_any.isdisjoint(str(g) for g in genres):
+        return False
     if exp.year_min is not None:
-        y = row.get("release_year")
+        y = rec.get("release_year")
         if y is None or y < exp.year_min:
             return False
     if exp.year_max is not None:
-        y = row.get("release_year")
+        y = rec.get("release_year")
         if y is None or y > exp.year_max:
             return False
     if exp.ratings_any:
-        r = row.get("rating")
-        if r is None or r not in set(exp.ratings_any):
+        r = rec.get("rating")
+        if r is None or r not in exp.ratings_any:
             return False
     if exp.runtime_max is not None:
-        rm = row.get("runtime_minutes")
+        rm = rec.get("runtime_minutes")
         if rm is None or rm > exp.runtime_max:
             return False
     return True
@@ -105,31 +110,52 @@ def hit_rate_at_k(rels: List[int], k: int) -> float:
     return 1.0 if any(rels[:k]) else 0.0
 
 
-def rank_tfidf(df: pd.DataFrame, query: str, k: int) -> List[int]:
+def fit_tfidf(df: pd.DataFrame) -> Tuple[TfidfVectorizer, Any]:
+    """Fit the vectorizer + matrix once; per-query work is then one transform + matvec."""
     vec = TfidfVectorizer()
     X = vec.fit_transform(df["combined_features"].fillna("").astype(str).tolist())
-    qv = vec.transform([query])
-    sims = (X @ qv.T).toarray().reshape(-1)
-    order = np.argsort(-sims)
-    return [int(i) for i in order[:k]]
+    return vec, X
+
+
+def rank_tfidf(X: Any, vec: TfidfVectorizer, query: str, k: int) -> List[int]:
+    sims = (X @ vec.transform([query]).T).toarray().ravel()
+    k = min(k, sims.shape[0])
+    # argpartition is O(N) vs O(N log N) for a full sort; only the top-k gets sorted.
+    top = np.argpartition(-sims, k - 1)[:k]
+    top = top[np.argsort(-sims[top])]
+    return [int(i) for i in top]
 
 
-def rank_embeddings(df: pd.DataFrame, query: str, k: int) -> Optional[List[int]]:
+def load_normalized_embeddings(expected_rows: int) -> Optional[np.ndarray]:
+    """Load + L2-normalize the cached embedding matrix once for the whole run."""
+    if not os.path.exists(settings.embeddings_npy_path) or not os.path.exists(settings.embeddings_meta_path):
+        return None
+    emb = np.load(settings.embeddings_npy_path).astype(np.float32)
+    if emb.ndim != 2 or emb.shape[0] != expected_rows:
+        return None
+    sq = np.einsum("ij,ij->i", emb, emb, dtype=np.float32)
+    return emb / (np.sqrt(sq, dtype=np.float32).reshape(-1, 1) + np.float32(1e-12))
+
+
+def rank_embeddings_batch(emb: np.ndarray, queries: List[str], k: int) -> Optional[List[List[int]]]:
+    """
+    Encode the whole query set in one batch and score it with a single GEMM:
+    1x(encode)+1x(Q @ emb.T) instead of per-query model loads and matvecs.
+    """
     try:
         from sentence_transformers import SentenceTransformer  # type: ignore
     except Exception:
         return None
-    if not os.path.exists(settings.embeddings_npy_path) or not os.path.exists(settings.embeddings_meta_path):
-        return None
-    emb = np.load(settings.embeddings_npy_path).astype(np.float32)
-    norms = np.linalg.norm(emb, axis=1, keepdims=True) + 1e-12
-    emb = emb / norms
     model = SentenceTransformer(settings.embedding_model_name)
-    q = model.encode([query], normalize_embeddings=True)
-    qv = np.asarray(q, dtype=np.float32).reshape(-1)
-    sims = emb @ qv
-    order = np.argsort(-sims)
-    return [int(i) for i in order[:k]]
+    Q = np.asarray(model.encode(queries, batch_size=64, normalize_embeddings=True), dtype=np.float32)
+    sims_all = Q @ emb.T  # (num_queries, num_titles)
+    k = min(k, emb.shape[0])
+    part = np.argpartition(-sims_all, k - 1, axis=1)[:, :k]
+    out: List[List[int]] = []
+    for sims, p in zip(sims_all, part):
+        top = p[np.argsort(-sims[p])]
+        out.append([int(i) for i in top])
+    return out
 
 
 def main() -> int:
@@ -138,29 +164,42 @@ def main() -> int:
     ap.add_argument("--k", type=int, default=5)
     args = ap.parse_args()
 
-    catalog = ensure_clean_catalog(settings.raw_csv_path, settings.persona_csv_path, settings.clean_csv_path)
+    catalog = ensure_clean_catalog(
+        settings.raw_csv_path,
+        settings.persona_csv_path,
+        settings.clean_csv_path,
+        clean_parquet_path=settings.clean_parquet_path,
+    )
     df = catalog.df.copy()
-    # Ensure genres are lists (clean CSV stores repr strings).
+    # Ensure genres are lists (clean CSV stores JSON arrays; legacy files used repr).
     if isinstance(df.iloc[0].get("genres"), str):
-        df["genres"] = df["genres"].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else x)
+        df["genres"] = df["genres"].apply(
+            lambda x: (json.loads(x) if x.startswith('["') or x == "[]" else ast.literal_eval(x)) if isinstance(x, str) else x
+        )
 
     qs = load_queries(args.queries)
     k = args.k
+    # Plain dict records: df.iloc builds a Series per access, which dominates
+    # the relevance-judging loop at K x Q x engines lookups.
+    records = df.to_dict("records")
+
+    vec, X = fit_tfidf(df)
 
     engines = ["tfidf"]
-    has_emb = rank_embeddings(df, "warmup", k=1) is not None
-    if has_emb:
+    emb = load_normalized_embeddings(expected_rows=len(df))
+    emb_ranks = rank_embeddings_batch(emb, [q for q, _ in qs], k=k) if emb is not None else None
+    if emb_ranks is not None:
         engines.append("embeddings")
 
     rows: List[Dict[str, Any]] = []
-    for q, exp in qs:
+    for qi, (q, exp) in enumerate(qs):
         for eng in engines:
             if eng == "tfidf":
-                idxs = rank_tfidf(df, q, k=k)
+                idxs = rank_tfidf(X, vec, q, k=k)
             else:
-                idxs = rank_embeddings(df, q, k=k) or []
+                idxs = emb_ranks[qi]
 
-            rels = [1 if is_relevant(df.iloc[i], exp) else 0 for i in idxs]
+            rels = [1 if is_relevant(records[i], exp) else 0 for i in idxs]
             rows.append(
                 {
                     "engine": eng,
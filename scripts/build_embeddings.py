@@ -24,6 +24,11 @@ def main() -> int:
     ap.add_argument("--out", default="data/embeddings.npy", help="Embeddings output .npy (default: data/embeddings.npy)")
     ap.add_argument("--meta", default="data/embeddings_meta.json", help="Meta output .json (default: data/embeddings_meta.json)")
     ap.add_argument("--model", default="all-MiniLM-L6-v2", help="SentenceTransformer model name (default: all-MiniLM-L6-v2)")
+    ap.add_argument(
+        "--quantize",
+        action="store_true",
+        help="Also write symmetric per-row int8 embeddings (~4x smaller cache; negligible recall impact on normalized vectors)",
+    )
     args = ap.parse_args()
 
     if not os.path.exists(args.clean):
@@ -32,9 +37,18 @@ def main() -> int:
     os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
     os.makedirs(os.path.dirname(args.meta) or ".", exist_ok=True)
 
+    def _parse_genres(x):
+        if not isinstance(x, str) or not x:
+            return [] if not isinstance(x, list) else x
+        try:
+            return json.loads(x)
+        except ValueError:
+            # Legacy clean CSVs serialized genres with repr().
+            return ast.literal_eval(x)
+
     df = pd.read_csv(args.clean)
     if "genres" in df.columns:
-        df["genres"] = df["genres"].apply(lambda x: [] if pd.isna(x) else ast.literal_eval(x) if isinstance(x, str) else x)
+        df["genres"] = df["genres"].apply(_parse_genres)
 
     def _to_int_or_none(x):
         if x is None or (isinstance(x, float) and pd.isna(x)) or pd.isna(x):
@@ -63,7 +77,23 @@ def main() -> int:
     t0 = time.time()
     emb = model.encode(texts, batch_size=64, show_progress_bar=True, normalize_embeddings=True)
     emb = np.asarray(emb, dtype=np.float32)
-    np.save(args.out, emb)
+    # Normalize explicitly (encode already should, but belt-and-braces) and
+    # save C-contiguous so the service can mmap and use rows directly without
+    # a startup renormalization pass that would copy the whole matrix.
+    sq = np.einsum("ij,ij->i", emb, emb, dtype=np.float32)
+    emb = emb / (np.sqrt(sq, dtype=np.float32).reshape(-1, 1) + np.float32(1e-12))
+    np.save(args.out, np.ascontiguousarray(emb, dtype=np.float32))
+
+    quantized = False
+    if args.quantize:
+        base, _ = os.path.splitext(args.out)
+        scales = np.abs(emb).max(axis=1, keepdims=True) / 127.0
+        scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+        emb_q = np.clip(np.round(emb / scales), -127, 127).astype(np.int8)
+        np.save(base + "_q.npy", emb_q)
+        np.save(base + "_scales.npy", scales)
+        quantized = True
+        print(f"Wrote int8 embeddings -> {base}_q.npy (+ {base}_scales.npy)")
 
     meta: Dict[str, Any] = {
         "created_at_ms": int(time.time() * 1000),
@@ -73,6 +103,8 @@ def main() -> int:
         "rows": int(len(df)),
         "dim": int(emb.shape[1]) if emb.ndim == 2 else None,
         "clean_path": args.clean,
+        "quantized": quantized,
+        "normalized": True,
     }
     with open(args.meta, "w", encoding="utf-8") as f:
         json.dump(meta, f, indent=2, ensure_ascii=True)
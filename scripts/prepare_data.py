@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import argparse
+import json
 import os
 import sys
 
@@ -28,7 +29,7 @@ def main() -> int:
 
     df = prepare_clean_dataframe(raw_csv_path=args.raw, persona_csv_path=args.persona)
     df_to_save = df.copy()
-    df_to_save["genres"] = df_to_save["genres"].apply(lambda xs: repr(xs or []))
+    df_to_save["genres"] = df_to_save["genres"].apply(lambda xs: json.dumps(xs or []))
     df_to_save.to_csv(args.out, index=False)
 
     print(f"Wrote {len(df_to_save)} rows -> {args.out}")